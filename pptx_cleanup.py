@@ -10,13 +10,103 @@ Usage:
 from __future__ import annotations
 
 import argparse
+import fnmatch
+import functools
 import os
 import shutil
 import sys
-import xml.etree.ElementTree as ET
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+try:
+    from lxml import etree as ET
+    HAS_LXML = True
+except ImportError:
+    import xml.etree.ElementTree as ET
+    HAS_LXML = False
+
+NAMESPACES: dict[str, str] = {
+    'a': 'http://schemas.openxmlformats.org/drawingml/2006/main',
+    'r': 'http://schemas.openxmlformats.org/officeDocument/2006/relationships',
+    'p': 'http://schemas.openxmlformats.org/presentationml/2006/main',
+    'rel': 'http://schemas.openxmlformats.org/package/2006/relationships',
+    'ct': 'http://schemas.openxmlformats.org/package/2006/content-types'
+}
+
+# Relationship type URIs (transitional and strict OOXML)
+_REL_TYPE_PREFIXES = (
+    'http://schemas.openxmlformats.org/officeDocument/2006/relationships/',
+    'http://purl.oclc.org/ooxml/officeDocument/relationships/',
+)
+LAYOUT_TYPES = frozenset(sys.intern(prefix + 'slideLayout') for prefix in _REL_TYPE_PREFIXES)
+MASTER_TYPES = frozenset(sys.intern(prefix + 'slideMaster') for prefix in _REL_TYPE_PREFIXES)
+IMAGE_TYPES = frozenset(sys.intern(prefix + 'image') for prefix in _REL_TYPE_PREFIXES)
+
+# (Id, Target, Type) of a single <Relationship>
+RelTriple = tuple[str | None, str | None, str | None]
+
+# Qualified tag and attribute names, interned once for the per-element lookups
+REL_TAG = sys.intern(f"{{{NAMESPACES['rel']}}}Relationship")
+SLDMASTERID_TAG = sys.intern(f"{{{NAMESPACES['p']}}}sldMasterId")
+SLDID_TAG = sys.intern(f"{{{NAMESPACES['p']}}}sldId")
+OVERRIDE_TAG = sys.intern(f"{{{NAMESPACES['ct']}}}Override")
+RID_ATTR = sys.intern(f"{{{NAMESPACES['r']}}}id")
+ID_ATTR = sys.intern('Id')
+TARGET_ATTR = sys.intern('Target')
+TYPE_ATTR = sys.intern('Type')
+TARGETMODE_ATTR = sys.intern('TargetMode')
+PARTNAME_ATTR = sys.intern('PartName')
+
+
+def iter_elements(path: str | Path, tags: Iterable[str]) -> Iterator[Any]:
+    """Stream elements with the given tags, clearing each one once consumed."""
+    tags = tuple(tags)
+    if HAS_LXML:
+        context = ET.iterparse(str(path), events=('end',), tag=tags)
+    else:
+        context = ET.iterparse(str(path), events=('end',))
+
+    for _, el in context:
+        if not HAS_LXML and el.tag not in tags:
+            continue
+        yield el
+        el.clear()
+        if HAS_LXML:
+            while el.getprevious() is not None:
+                del el.getparent()[0]
+
+
+def iter_relationships(path: str | Path) -> Iterator[RelTriple]:
+    """Stream (Id, Target, Type) triples from a .rels file.
+
+    External relationships (TargetMode="External", e.g. linked pictures) are skipped,
+    since their targets are URLs rather than parts of the package.
+    """
+    for el in iter_elements(path, (REL_TAG,)):
+        if el.get(TARGETMODE_ATTR) == 'External':
+            continue
+        yield el.get(ID_ATTR), el.get(TARGET_ATTR), el.get(TYPE_ATTR)
+
+
+def write_xml(path: Path, root: Any) -> None:
+    """Serialize an element to path with an XML declaration in a single write."""
+    if HAS_LXML:
+        data = ET.tostring(root, xml_declaration=True, encoding='UTF-8', standalone=True)
+    else:
+        data = ET.tostring(root, encoding='UTF-8', xml_declaration=True)
+    path.write_bytes(data)
+
+
+def unlink_if_present(path: str | Path) -> bool:
+    """Delete a file without a prior exists() check. Returns False if it was already gone."""
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        return False
+    return True
 
 
 class PPTXCleaner:
@@ -25,41 +115,117 @@ class PPTXCleaner:
     def __init__(self, pptx_folder: str | Path, verbose: bool = True) -> None:
         self.pptx_folder = Path(pptx_folder).resolve()
         self.verbose = verbose
-        self.namespaces: dict[str, str] = {
-            'a': 'http://schemas.openxmlformats.org/drawingml/2006/main',
-            'r': 'http://schemas.openxmlformats.org/officeDocument/2006/relationships',
-            'p': 'http://schemas.openxmlformats.org/presentationml/2006/main',
-            'rel': 'http://schemas.openxmlformats.org/package/2006/relationships',
-            'ct': 'http://schemas.openxmlformats.org/package/2006/content-types'
-        }
+        self.namespaces: dict[str, str] = dict(NAMESPACES)
 
         # Register namespaces
         for prefix, uri in self.namespaces.items():
             ET.register_namespace(prefix, uri)
 
-        # Active components
-        self.active_slides: list[Path] = []
-        self.active_masters: set[Path] = set()
-        self.active_layouts: set[Path] = set()
+        # Active components (normalized, case-folded absolute paths; see _norm)
+        self.active_slides: list[str] = []
+        self.active_masters: set[str] = set()
+        self.active_layouts: set[str] = set()
 
         # All components
-        self.all_masters: set[Path] = set()
-        self.all_layouts: set[Path] = set()
+        self.all_masters: set[str] = set()
+        self.all_layouts: set[str] = set()
         self.all_images: set[str] = set()
+        self._image_sizes: dict[str, int] = {}
 
         # Referenced media
         self.image_references: dict[str, list[str]] = defaultdict(list)
 
         # Unused components
-        self.unused_masters: set[Path] = set()
-        self.unused_layouts: set[Path] = set()
+        self.unused_masters: set[str] = set()
+        self.unused_layouts: set[str] = set()
         self.unused_images: set[str] = set()
 
+        # Parsed .rels files, keyed by path
+        self._rels_cache: dict[str, list[RelTriple]] = {}
+
+        # Directory listings from the single walk over ppt/ (case-folded like _norm)
+        self._tree_scanned = False
+        self._rels_index: dict[str, set[str]] = {}
+        self._layout_files: set[str] = set()
+        self._media_files: list[os.DirEntry[str]] | None = None
+
+        # On-disk spelling of every scanned file, keyed like the component sets
+        self._disk_paths: dict[str, str] = {}
+
     def log(self, message: str) -> None:
         """Print message if verbose mode enabled."""
         if self.verbose:
             print(message)
 
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def _norm(base: str, target: str) -> str:
+        """Resolve a relationship target against its base folder lexically.
+
+        The result is case-folded on case-insensitive platforms, since part names
+        in a package may differ in case from the files on disk.
+        """
+        return os.path.normcase(os.path.normpath(os.path.join(base, target)))
+
+    def _display(self, path: str) -> str:
+        """Return the on-disk spelling of a component key for printing and deletion."""
+        return self._disk_paths.get(path, path)
+
+    def _get_rels(self, component: str) -> list[RelTriple]:
+        """Return (Id, Target, Type) triples from a component's .rels file, parsing it at most once."""
+        base, name = os.path.split(component)
+        rels_dir = os.path.join(base, '_rels')
+        rels_file = os.path.join(rels_dir, f"{name}.rels")
+        cached = self._rels_cache.get(rels_file)
+        if cached is not None:
+            return cached
+
+        rels: list[RelTriple] = []
+        indexed = self._rels_index.get(rels_dir)
+        present = os.path.exists(rels_file) if indexed is None else os.path.normcase(f"{name}.rels") in indexed
+        if present:
+            try:
+                rels = list(iter_relationships(rels_file))
+            except ET.ParseError:
+                pass
+        self._rels_cache[rels_file] = rels
+        return rels
+
+    def _scan_pptx_tree(self) -> None:
+        """Walk ppt/ once, indexing layouts, media, and every _rels folder for the later passes."""
+        ppt_dir = os.path.join(self.pptx_folder, 'ppt')
+        layouts_dir = os.path.normcase(os.path.join(ppt_dir, 'slideLayouts'))
+        media_dir = os.path.normcase(os.path.join(ppt_dir, 'media'))
+        self._rels_index.clear()
+        self._layout_files = set()
+        self._media_files = None
+        self._disk_paths.clear()
+
+        pending = [ppt_dir]
+        while pending:
+            current = pending.pop()
+            files: list[os.DirEntry[str]] = []
+            with os.scandir(current) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                    elif entry.is_file():
+                        files.append(entry)
+                        self._disk_paths[os.path.normcase(entry.path)] = entry.path
+
+            folder = os.path.normcase(current)
+            if os.path.basename(folder) == '_rels':
+                self._rels_index[folder] = {os.path.normcase(e.name) for e in files}
+            elif folder == layouts_dir:
+                self._layout_files = {
+                    os.path.normcase(e.path) for e in files
+                    if fnmatch.fnmatch(e.name, 'slideLayout*.xml')
+                }
+            elif folder == media_dir:
+                self._media_files = files
+
+        self._tree_scanned = True
+
     def validate_folder(self) -> bool:
         """Validate this is an unzipped PowerPoint folder."""
         required = [
@@ -70,183 +236,113 @@ class PPTXCleaner:
             if not path.exists():
                 print(f"Error: {path} not found. Is this an unzipped .pptx?")
                 return False
+
+        self._scan_pptx_tree()
         return True
 
     def parse_presentation_structure(self) -> bool:
         """Parse presentation.xml to find active slides and masters."""
-        self.log("\n[1/5] Parsing presentation structure...")
+        self.log("\n[1/4] Parsing presentation structure...")
 
         pres_file = self.pptx_folder / 'ppt' / 'presentation.xml'
         pres_rels = self.pptx_folder / 'ppt' / '_rels' / 'presentation.xml.rels'
 
-        tree = ET.parse(pres_file)
-        root = tree.getroot()
-
-        # Get all master relationship IDs
-        master_list = root.find('.//p:sldMasterIdLst', self.namespaces)
+        # Get all master and active slide relationship IDs
         all_master_rids = []
-        if master_list is not None:
-            for master_id in master_list.findall('.//p:sldMasterId', self.namespaces):
-                rid = master_id.get('{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id')
-                if rid:
-                    all_master_rids.append(rid)
-
-        # Get active slide relationship IDs
-        slide_list = root.find('.//p:sldIdLst', self.namespaces)
         active_slide_rids = []
-        if slide_list is not None:
-            for slide_id in slide_list.findall('.//p:sldId', self.namespaces):
-                rid = slide_id.get('{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id')
-                if rid:
-                    active_slide_rids.append(rid)
+        for el in iter_elements(pres_file, (SLDMASTERID_TAG, SLDID_TAG)):
+            rid = el.get(RID_ATTR)
+            if not rid:
+                continue
+            if el.tag == SLDMASTERID_TAG:
+                all_master_rids.append(rid)
+            else:
+                active_slide_rids.append(rid)
 
         # Resolve relationships
-        rels_tree = ET.parse(pres_rels)
-        rels_root = rels_tree.getroot()
+        ppt_dir = str(self.pptx_folder / 'ppt')
+        rid_map = {rid: (target, rtype) for rid, target, rtype in iter_relationships(pres_rels)}
 
         # Map all masters
         for rid in all_master_rids:
-            rel = rels_root.find(f".//rel:Relationship[@Id='{rid}']", self.namespaces)
-            if rel is not None:
-                target = rel.get('Target')
-                if target:
-                    master_path = (self.pptx_folder / 'ppt' / target).resolve()
-                    self.all_masters.add(master_path)
-
-        # Find active slides and their masters
+            target, _ = rid_map.get(rid, (None, None))
+            if target:
+                master_path = self._norm(ppt_dir, target)
+                self.all_masters.add(master_path)
+
+        # Find active slides
         for rid in active_slide_rids:
-            rel = rels_root.find(f".//rel:Relationship[@Id='{rid}']", self.namespaces)
-            if rel is not None:
-                target = rel.get('Target')
-                if target:
-                    slide_path = (self.pptx_folder / 'ppt' / target).resolve()
-                    self.active_slides.append(slide_path)
-                    master = self._find_master_for_slide(slide_path)
-                    if master:
-                        self.active_masters.add(master)
+            target, _ = rid_map.get(rid, (None, None))
+            if target:
+                self.active_slides.append(self._norm(ppt_dir, target))
 
         self.log(f"    Found {len(self.active_slides)} active slides")
-        self.log(f"    Found {len(self.active_masters)}/{len(self.all_masters)} masters in use")
         return True
 
-    def _find_master_for_slide(self, slide_path: Path) -> Path | None:
-        """Find which master a slide uses via its layout."""
-        slide_rels = slide_path.parent / '_rels' / f"{slide_path.name}.rels"
-        if not slide_rels.exists():
-            return None
-
-        try:
-            tree = ET.parse(slide_rels)
-            root = tree.getroot()
-
-            for rel in root.findall('.//rel:Relationship', self.namespaces):
-                if 'slideLayout' in rel.get('Type', ''):
-                    target = rel.get('Target')
-                    if target:
-                        layout_path = (slide_path.parent / target).resolve()
-                        self.active_layouts.add(layout_path)
-                        return self._find_master_for_layout(layout_path)
-        except ET.ParseError:
-            pass
-        return None
-
-    def _find_master_for_layout(self, layout_path: Path) -> Path | None:
-        """Find which master a layout belongs to."""
-        layout_rels = layout_path.parent / '_rels' / f"{layout_path.name}.rels"
-        if not layout_rels.exists():
-            return None
-
-        try:
-            tree = ET.parse(layout_rels)
-            root = tree.getroot()
-
-            for rel in root.findall('.//rel:Relationship', self.namespaces):
-                if 'slideMaster' in rel.get('Type', ''):
-                    target = rel.get('Target')
-                    if target:
-                        return (layout_path.parent / target).resolve()
-        except ET.ParseError:
-            pass
-        return None
-
-    def find_all_layouts(self) -> None:
-        """Find all layouts and identify which are used by active masters."""
-        self.log("\n[2/5] Analyzing layouts...")
-
-        layouts_dir = self.pptx_folder / 'ppt' / 'slideLayouts'
-        if layouts_dir.exists():
-            for layout_file in layouts_dir.glob('slideLayout*.xml'):
-                self.all_layouts.add(layout_file.resolve())
-
-        # Find layouts used by active masters
-        for master_path in self.active_masters:
-            master_rels = master_path.parent / '_rels' / f"{master_path.name}.rels"
-            if not master_rels.exists():
-                continue
-
-            try:
-                tree = ET.parse(master_rels)
-                root = tree.getroot()
-
-                for rel in root.findall('.//rel:Relationship', self.namespaces):
-                    if 'slideLayout' in rel.get('Type', ''):
-                        target = rel.get('Target')
-                        if target:
-                            layout_path = (master_path.parent / target).resolve()
-                            self.active_layouts.add(layout_path)
-            except ET.ParseError:
-                pass
+    def trace_active_components(self) -> None:
+        """Follow slide -> layout -> master links, collecting media references on the way."""
+        self.log("\n[2/4] Tracing layouts, masters, and media...")
+
+        if not self._tree_scanned:
+            self._scan_pptx_tree()
+        self.all_layouts.update(self._layout_files)
+
+        # Breadth-first over the reachable parts; each rels file is read once for all of its links
+        frontier = list(dict.fromkeys(self.active_slides))
+        seen = set(frontier)
+        with ThreadPoolExecutor() as ex:
+            while frontier:
+                next_frontier = []
+                for component, rels in zip(frontier, ex.map(self._get_rels, frontier)):
+                    base, name = os.path.split(component)
+                    for _, target, rtype in rels:
+                        if not target:
+                            continue
+                        if rtype in IMAGE_TYPES:
+                            self.image_references[os.path.basename(target)].append(name)
+                            continue
+                        if rtype in LAYOUT_TYPES:
+                            found = self.active_layouts
+                        elif rtype in MASTER_TYPES:
+                            found = self.active_masters
+                        else:
+                            continue
+                        linked = self._norm(base, target)
+                        found.add(linked)
+                        if linked not in seen:
+                            seen.add(linked)
+                            next_frontier.append(linked)
+                frontier = next_frontier
 
+        self.log(f"    Found {len(self.active_masters)}/{len(self.all_masters)} masters in use")
         self.log(f"    Found {len(self.active_layouts)}/{len(self.all_layouts)} layouts in use")
+        self.log(f"    Found {len(self.image_references)} images referenced by active content")
 
     def scan_media_files(self) -> None:
         """Scan for all media files."""
-        self.log("\n[3/5] Scanning media files...")
+        self.log("\n[3/4] Scanning media files...")
 
-        media_path = self.pptx_folder / 'ppt' / 'media'
-        if not media_path.exists():
+        if not self._tree_scanned:
+            self._scan_pptx_tree()
+        if self._media_files is None:
             self.log("    No media folder found")
             return
 
         image_extensions = {'.png', '.jpg', '.jpeg', '.gif', '.bmp', '.tiff', '.emf', '.wmf', '.svg'}
-        for file in media_path.iterdir():
-            if file.is_file() and file.suffix.lower() in image_extensions:
-                self.all_images.add(file.name)
+        for entry in self._media_files:
+            if os.path.splitext(entry.name)[1].lower() in image_extensions:
+                self.all_images.add(entry.name)
+                self._image_sizes[entry.name] = entry.stat().st_size
 
         self.log(f"    Found {len(self.all_images)} image files")
 
-    def find_referenced_media(self) -> None:
-        """Find all media referenced by active components."""
-        self.log("\n[4/5] Finding media references...")
-
-        components = list(self.active_slides) + list(self.active_masters) + list(self.active_layouts)
-
-        for component in components:
-            rels_file = component.parent / '_rels' / f"{component.name}.rels"
-            if not rels_file.exists():
-                continue
-
-            try:
-                tree = ET.parse(rels_file)
-                root = tree.getroot()
-
-                for rel in root.findall('.//rel:Relationship', self.namespaces):
-                    target = rel.get('Target', '')
-                    if 'media/' in target or '../media/' in target:
-                        filename = os.path.basename(target)
-                        self.image_references[filename].append(str(component.name))
-            except ET.ParseError:
-                pass
-
-        self.log(f"    Found {len(self.image_references)} images referenced by active content")
-
     def calculate_unused(self) -> None:
         """Calculate all unused components."""
-        self.log("\n[5/5] Calculating unused components...")
+        self.log("\n[4/4] Calculating unused components...")
 
         self.unused_masters = self.all_masters - self.active_masters
         self.unused_layouts = self.all_layouts - self.active_layouts
-        self.unused_images = self.all_images - set(self.image_references.keys())
+        self.unused_images = self.all_images - self.image_references.keys()
 
         self.log(f"    Unused masters: {len(self.unused_masters)}")
         self.log(f"    Unused layouts: {len(self.unused_layouts)}")
@@ -268,8 +364,7 @@ class PPTXCleaner:
         if self.unused_images:
             print(f"\n--- UNUSED IMAGES ({len(self.unused_images)}) ---")
             for img in sorted(self.unused_images):
-                img_path = self.pptx_folder / 'ppt' / 'media' / img
-                size = img_path.stat().st_size if img_path.exists() else 0
+                size = self._image_sizes.get(img, 0)
                 total_size += size
                 print(f"  {img}: {size:,} bytes")
             print(f"\nTotal space to reclaim: {total_size:,} bytes ({total_size/1024/1024:.2f} MB)")
@@ -277,13 +372,13 @@ class PPTXCleaner:
         if self.unused_masters:
             print(f"\n--- UNUSED MASTERS ({len(self.unused_masters)}) ---")
             for master in sorted(self.unused_masters):
-                print(f"  {master.name}")
+                print(f"  {Path(self._display(master)).name}")
 
         if self.unused_layouts:
             print(f"\n--- UNUSED LAYOUTS ({len(self.unused_layouts)}) ---")
             count = min(20, len(self.unused_layouts))
             for layout in sorted(list(self.unused_layouts))[:count]:
-                print(f"  {layout.name}")
+                print(f"  {Path(self._display(layout)).name}")
             if len(self.unused_layouts) > 20:
                 print(f"  ... and {len(self.unused_layouts) - 20} more")
 
@@ -314,15 +409,24 @@ class PPTXCleaner:
 
         removed = 0
         for img in self.unused_images:
-            img_path = self.pptx_folder / 'ppt' / 'media' / img
-            if img_path.exists():
-                img_path.unlink()
+            if unlink_if_present(os.path.join(self.pptx_folder, 'ppt', 'media', img)):
                 removed += 1
                 print(f"  Removed: {img}")
 
         print(f"\nRemoved {removed} unused images.")
         return removed
 
+    def _remove_content_types(self, part_names: set[str]) -> None:
+        """Drop the [Content_Types].xml overrides for the given part names."""
+        ct_file = self.pptx_folder / '[Content_Types].xml'
+        ct_root = ET.parse(ct_file).getroot()
+
+        for override in list(ct_root):
+            if override.tag == OVERRIDE_TAG and override.get(PARTNAME_ATTR) in part_names:
+                ct_root.remove(override)
+
+        write_xml(ct_file, ct_root)
+
     def remove_unused_masters(self) -> int:
         """Remove unused masters and update XML files. Returns count of removed masters."""
         if not self.unused_masters:
@@ -333,53 +437,43 @@ class PPTXCleaner:
 
         # Find relationship IDs for unused masters
         pres_rels = self.pptx_folder / 'ppt' / '_rels' / 'presentation.xml.rels'
-        rels_tree = ET.parse(pres_rels)
-        rels_root = rels_tree.getroot()
-
-        rids_to_delete = []
-        for master in self.unused_masters:
-            master_target = f"slideMasters/{master.name}"
-            for rel in rels_root.findall('.//rel:Relationship', self.namespaces):
-                if master_target in rel.get('Target', ''):
-                    rids_to_delete.append(rel.get('Id'))
-                    break
+        ppt_dir = str(self.pptx_folder / 'ppt')
+        target_to_rid = {
+            self._norm(ppt_dir, target): rid
+            for rid, target, _ in iter_relationships(pres_rels)
+            if target
+        }
+        rids_to_delete = {target_to_rid[m] for m in self.unused_masters if m in target_to_rid}
 
         # Update presentation.xml
         pres_file = self.pptx_folder / 'ppt' / 'presentation.xml'
-        pres_tree = ET.parse(pres_file)
-        pres_root = pres_tree.getroot()
+        pres_root = ET.parse(pres_file).getroot()
 
         master_list = pres_root.find('.//p:sldMasterIdLst', self.namespaces)
         if master_list is not None:
-            for master_id in list(master_list.findall('.//p:sldMasterId', self.namespaces)):
-                rid = master_id.get('{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id')
-                if rid in rids_to_delete:
-                    master_list.remove(master_id)
+            stale = [
+                master_id for master_id in master_list.iterfind('p:sldMasterId', self.namespaces)
+                if master_id.get(RID_ATTR) in rids_to_delete
+            ]
+            for master_id in stale:
+                master_list.remove(master_id)
 
-        pres_tree.write(pres_file, encoding='UTF-8', xml_declaration=True)
+        write_xml(pres_file, pres_root)
 
         # Update [Content_Types].xml
-        ct_file = self.pptx_folder / '[Content_Types].xml'
-        ct_tree = ET.parse(ct_file)
-        ct_root = ct_tree.getroot()
-
-        for master in self.unused_masters:
-            part_name = f"/ppt/slideMasters/{master.name}"
-            for override in list(ct_root.findall('.//ct:Override', self.namespaces)):
-                if override.get('PartName') == part_name:
-                    ct_root.remove(override)
-
-        ct_tree.write(ct_file, encoding='UTF-8', xml_declaration=True)
+        self._remove_content_types({f"/ppt/slideMasters/{os.path.basename(self._display(m))}" for m in self.unused_masters})
 
         # Delete master files
         removed = 0
-        for master in self.unused_masters:
-            if master.exists():
-                master.unlink()
+        for master in map(self._display, self.unused_masters):
+            if unlink_if_present(master):
                 removed += 1
-            rels = master.parent / '_rels' / f"{master.name}.rels"
-            if rels.exists():
-                rels.unlink()
+            base, name = os.path.split(master)
+            unlink_if_present(os.path.join(base, '_rels', f"{name}.rels"))
+
+        # Cached .rels contents no longer reflect the folder
+        self._rels_cache.clear()
+        self._rels_index.clear()
 
         print(f"\nRemoved {removed} unused masters.")
         return removed
@@ -393,28 +487,20 @@ class PPTXCleaner:
         self.create_backup()
 
         # Update [Content_Types].xml
-        ct_file = self.pptx_folder / '[Content_Types].xml'
-        ct_tree = ET.parse(ct_file)
-        ct_root = ct_tree.getroot()
-
-        for layout in self.unused_layouts:
-            part_name = f"/ppt/slideLayouts/{layout.name}"
-            for override in list(ct_root.findall('.//ct:Override', self.namespaces)):
-                if override.get('PartName') == part_name:
-                    ct_root.remove(override)
-
-        ct_tree.write(ct_file, encoding='UTF-8', xml_declaration=True)
+        self._remove_content_types({f"/ppt/slideLayouts/{os.path.basename(self._display(l))}" for l in self.unused_layouts})
 
         # Delete layout files
         removed = 0
-        for layout in self.unused_layouts:
-            if layout.exists():
-                layout.unlink()
+        for layout in map(self._display, self.unused_layouts):
+            base, name = os.path.split(layout)
+            if unlink_if_present(layout):
                 removed += 1
-                print(f"  Removed: {layout.name}")
-            rels = layout.parent / '_rels' / f"{layout.name}.rels"
-            if rels.exists():
-                rels.unlink()
+                print(f"  Removed: {name}")
+            unlink_if_present(os.path.join(base, '_rels', f"{name}.rels"))
+
+        # Cached .rels contents no longer reflect the folder
+        self._rels_cache.clear()
+        self._rels_index.clear()
 
         print(f"\nRemoved {removed} unused layouts.")
         return removed
@@ -422,62 +508,64 @@ class PPTXCleaner:
     def save_removal_scripts(self) -> None:
         """Generate bash scripts for removal."""
         # Image removal script
-        script = self.pptx_folder / 'remove_unused_images.sh'
-        with open(script, 'w', newline='\n') as f:
-            f.write("#!/bin/bash\n# Remove unused images\n\n")
-            if self.unused_images:
-                f.write(f"echo 'Removing {len(self.unused_images)} unused images...'\n")
-                for img in sorted(self.unused_images):
-                    f.write(f"rm -f 'ppt/media/{img}'\n")
-                f.write("\necho 'Done!'\n")
-            else:
-                f.write("echo 'No unused images.'\n")
+        lines = ["#!/bin/bash", "# Remove unused images", ""]
+        if self.unused_images:
+            lines.append(f"echo 'Removing {len(self.unused_images)} unused images...'")
+            lines.extend(f"rm -f 'ppt/media/{img}'" for img in sorted(self.unused_images))
+            lines += ["", "echo 'Done!'"]
+        else:
+            lines.append("echo 'No unused images.'")
+        with open(self.pptx_folder / 'remove_unused_images.sh', 'w', newline='\n') as f:
+            f.write("\n".join(lines) + "\n")
 
         # Master removal script
-        script = self.pptx_folder / 'remove_unused_masters.sh'
-        with open(script, 'w', newline='\n') as f:
-            f.write("#!/bin/bash\n# Remove unused masters\n")
-            f.write("# WARNING: Also requires updating presentation.xml and [Content_Types].xml\n\n")
-            if self.unused_masters:
-                f.write(f"echo 'Removing {len(self.unused_masters)} unused masters...'\n")
-                for master in sorted(self.unused_masters):
-                    rel = master.relative_to(self.pptx_folder)
-                    f.write(f"rm -f '{rel}'\n")
-                    f.write(f"rm -f '{rel.parent}/_rels/{master.name}.rels'\n")
-                f.write("\necho 'Done! Update [Content_Types].xml and presentation.xml manually.'\n")
-            else:
-                f.write("echo 'No unused masters.'\n")
+        lines = [
+            "#!/bin/bash",
+            "# Remove unused masters",
+            "# WARNING: Also requires updating presentation.xml and [Content_Types].xml",
+            "",
+        ]
+        if self.unused_masters:
+            lines.append(f"echo 'Removing {len(self.unused_masters)} unused masters...'")
+            for master in sorted(self.unused_masters):
+                rel = Path(self._display(master)).relative_to(self.pptx_folder)
+                lines.append(f"rm -f '{rel}'")
+                lines.append(f"rm -f '{rel.parent}/_rels/{rel.name}.rels'")
+            lines += ["", "echo 'Done! Update [Content_Types].xml and presentation.xml manually.'"]
+        else:
+            lines.append("echo 'No unused masters.'")
+        with open(self.pptx_folder / 'remove_unused_masters.sh', 'w', newline='\n') as f:
+            f.write("\n".join(lines) + "\n")
 
         # Layout removal script
-        script = self.pptx_folder / 'remove_unused_layouts.sh'
-        with open(script, 'w', newline='\n') as f:
-            f.write("#!/bin/bash\n# Remove unused layouts\n")
-            f.write("# WARNING: Also requires updating [Content_Types].xml\n\n")
-            if self.unused_layouts:
-                f.write(f"echo 'Removing {len(self.unused_layouts)} unused layouts...'\n")
-                for layout in sorted(self.unused_layouts):
-                    rel = layout.relative_to(self.pptx_folder)
-                    f.write(f"rm -f '{rel}'\n")
-                    f.write(f"rm -f '{rel.parent}/_rels/{layout.name}.rels'\n")
-                f.write("\necho 'Done! Update [Content_Types].xml manually.'\n")
-            else:
-                f.write("echo 'No unused layouts.'\n")
+        lines = [
+            "#!/bin/bash",
+            "# Remove unused layouts",
+            "# WARNING: Also requires updating [Content_Types].xml",
+            "",
+        ]
+        if self.unused_layouts:
+            lines.append(f"echo 'Removing {len(self.unused_layouts)} unused layouts...'")
+            for layout in sorted(self.unused_layouts):
+                rel = Path(self._display(layout)).relative_to(self.pptx_folder)
+                lines.append(f"rm -f '{rel}'")
+                lines.append(f"rm -f '{rel.parent}/_rels/{rel.name}.rels'")
+            lines += ["", "echo 'Done! Update [Content_Types].xml manually.'"]
+        else:
+            lines.append("echo 'No unused layouts.'")
+        with open(self.pptx_folder / 'remove_unused_layouts.sh', 'w', newline='\n') as f:
+            f.write("\n".join(lines) + "\n")
 
         # Text list
+        lines = ["UNUSED COMPONENTS", "="*70, ""]
+        lines.append(f"UNUSED IMAGES ({len(self.unused_images)}):")
+        lines.extend(f"  ppt/media/{img}" for img in sorted(self.unused_images))
+        lines.append(f"\nUNUSED MASTERS ({len(self.unused_masters)}):")
+        lines.extend(f"  {Path(self._display(m)).relative_to(self.pptx_folder)}" for m in sorted(self.unused_masters))
+        lines.append(f"\nUNUSED LAYOUTS ({len(self.unused_layouts)}):")
+        lines.extend(f"  {Path(self._display(l)).relative_to(self.pptx_folder)}" for l in sorted(self.unused_layouts))
         with open(self.pptx_folder / 'unused_components.txt', 'w') as f:
-            f.write("UNUSED COMPONENTS\n" + "="*70 + "\n\n")
-
-            f.write(f"UNUSED IMAGES ({len(self.unused_images)}):\n")
-            for img in sorted(self.unused_images):
-                f.write(f"  ppt/media/{img}\n")
-
-            f.write(f"\nUNUSED MASTERS ({len(self.unused_masters)}):\n")
-            for m in sorted(self.unused_masters):
-                f.write(f"  {m.relative_to(self.pptx_folder)}\n")
-
-            f.write(f"\nUNUSED LAYOUTS ({len(self.unused_layouts)}):\n")
-            for l in sorted(self.unused_layouts):
-                f.write(f"  {l.relative_to(self.pptx_folder)}\n")
+            f.write("\n".join(lines) + "\n")
 
         print("\nGenerated scripts:")
         print("  - remove_unused_images.sh")
@@ -491,9 +579,8 @@ class PPTXCleaner:
             return False
 
         self.parse_presentation_structure()
-        self.find_all_layouts()
+        self.trace_active_components()
         self.scan_media_files()
-        self.find_referenced_media()
         self.calculate_unused()
         self.generate_report()
         self.save_removal_scripts()